@@ -1,13 +1,27 @@
 import os
-import requests
+import asyncio
+import httpx
+import orjson
 from dotenv import load_dotenv
 from datetime import datetime
 import re
 import sys
+import time
+import shelve
+import hashlib
+import argparse
+from types import MappingProxyType
 
-# Load environment variables from .env file
-load_dotenv()
-API_KEY = os.getenv('API_FOOTBALL_KEY')
+def load_api_key():
+    """Load the .env file once per process and return the API key"""
+    # Guarded through the environment so the script run as __main__ and any
+    # import of this module share a single .env read
+    if not os.environ.get('_DOTENV_LOADED'):
+        load_dotenv()
+        os.environ['_DOTENV_LOADED'] = '1'
+    return os.getenv('API_FOOTBALL_KEY')
+
+API_KEY = load_api_key()
 
 # Validate API key exists
 if not API_KEY:
@@ -19,11 +33,45 @@ if not API_KEY:
 # Base URL and headers for RapidAPI
 BASE_URL = 'https://api-football-v1.p.rapidapi.com/v3'
 
-headers = {
-    'x-rapidapi-host': 'api-football-v1.p.rapidapi.com',
-    'x-rapidapi-key': API_KEY
+# Requests in flight at once; keeps us under RapidAPI's per-second rate limit
+MAX_CONCURRENT_REQUESTS = 8
+
+# Maximum fixture IDs the /fixtures endpoint accepts in one `ids` request
+FIXTURE_IDS_PER_CALL = 20
+
+# Size of the keep-alive connection pool to the API host (HTTP/1.1 fallback)
+MAX_CONNECTIONS = 16
+
+# On-disk response cache and how long (in seconds) each endpoint's data stays fresh
+CACHE_FILE = '.apifootball_cache'
+# Bump when the shape of cached data changes so stale entries are ignored
+CACHE_VERSION = 3
+CACHE_TTL = {
+    'leagues': 7 * 24 * 60 * 60,
+    'team_stats': 60 * 60,
+    'match_stats': 5 * 60,
+    'fixtures': 60
 }
 
+# Prediction scoring factors
+WIN_POINTS = 3
+DRAW_POINTS = 1
+LOSS_POINTS = -1
+GOAL_FOR_POINTS = 0.5
+GOAL_AGAINST_POINTS = -0.5
+
+# Opened in main(); lookups are skipped when --no-cache is given
+response_cache = None
+use_cached_responses = True
+
+# Read-only so the shared request headers cannot be mutated by accident
+headers = MappingProxyType({
+    'x-rapidapi-host': 'api-football-v1.p.rapidapi.com',
+    'x-rapidapi-key': API_KEY,
+    # Responses are large JSON documents that compress well; 'br' is decoded via Brotli
+    'Accept-Encoding': 'gzip, deflate, br'
+})
+
 def validate_date(date_str):
     """Validate date format and range"""
     try:
@@ -48,96 +96,135 @@ def validate_league_id(league_id_str):
     except ValueError:
         return False, "League ID must be a number"
 
-def safe_api_call(url, headers, params=None):
-    """Make API calls with error handling"""
+def cache_key(url, params):
+    """Build a stable cache key from the URL and query parameters"""
+    raw = f'v{CACHE_VERSION}:' + url + repr(sorted((params or {}).items()))
+    return hashlib.blake2b(raw.encode()).hexdigest()
+
+def is_cacheable(data):
+    """Only cache successful, non-empty payloads, never api-football error bodies"""
+    return not data.get('errors') and bool(data.get('response'))
+
+def prune_cache(cache):
+    """Drop expired entries so the cache file does not grow forever"""
+    now = time.time()
+    for key in list(cache.keys()):
+        if cache[key][0] <= now:
+            del cache[key]
+
+async def safe_api_call(client, url, params=None, ttl=0, project=None):
+    """Make API calls with error handling, serving fresh responses from the cache
+
+    When given, project() trims the payload before it is cached and returned.
+    """
+    key = cache_key(url, params)
+    if response_cache is not None and use_cached_responses and ttl > 0:
+        # Entries are stored as (expires_at, data)
+        entry = response_cache.get(key)
+        if entry and entry[0] > time.time():
+            return entry[1]
+        if entry:
+            del response_cache[key]
+
     try:
-        response = requests.get(url, headers=headers, params=params, timeout=10)
+        response = await client.get(url, params=params)
         response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
+        data = orjson.loads(response.content)
+    except httpx.HTTPError as e:
         print(f"❌ API Error: {e}")
         return None
     except ValueError as e:
         print(f"❌ JSON Parse Error: {e}")
         return None
 
-def get_leagues():
+    cacheable = is_cacheable(data)
+    if project is not None:
+        data = project(data)
+    if response_cache is not None and ttl > 0 and cacheable:
+        response_cache[key] = (time.time() + ttl, data)
+    return data
+
+def project_leagues(data):
+    """Keep only the ID, name and country of each league from the /leagues payload"""
+    return [
+        {'id': item['league']['id'], 'name': item['league']['name'], 'country': item['country']['name']}
+        for item in data.get('response', [])
+    ]
+
+async def get_leagues(client):
     url = f'{BASE_URL}/leagues'
-    data = safe_api_call(url, headers)
-    if data:
-        return data.get('response', [])
-    return []
+    data = await safe_api_call(client, url, ttl=CACHE_TTL['leagues'], project=project_leagues)
+    return data or []
 
-def get_matches(league_id, date_str):
-    date_obj = datetime.strptime(date_str, '%Y-%m-%d')
-    season = date_obj.year
+async def get_matches(client, league_id, date_str, season):
     url = f'{BASE_URL}/fixtures'
     params = {
         'league': league_id,
         'season': season,
         'date': date_str
     }
-    data = safe_api_call(url, headers, params)
+    data = await safe_api_call(client, url, params, ttl=CACHE_TTL['fixtures'])
     if data:
         return data.get('response', [])
     return []
 
-def get_match_stats(fixture_id):
-    url = f'{BASE_URL}/fixtures/statistics'
-    params = {
-        'fixture': fixture_id
-    }
-    data = safe_api_call(url, headers, params)
-    if data:
-        return data.get('response', [])
-    return []
+def project_fixture_stats(data):
+    """Keep only each fixture's statistics from a /fixtures?ids= payload"""
+    return {fixture['fixture']['id']: fixture.get('statistics', [])
+            for fixture in data.get('response', [])}
+
+async def get_fixtures_bulk(client, fixture_ids, semaphore):
+    """Fetch statistics for many fixtures, batching IDs into as few calls as the API allows"""
+    url = f'{BASE_URL}/fixtures'
+    chunks = [fixture_ids[i:i + FIXTURE_IDS_PER_CALL]
+              for i in range(0, len(fixture_ids), FIXTURE_IDS_PER_CALL)]
+
+    # Each chunk is its own request, so each one takes a slot under the request cap
+    async def fetch_chunk(chunk):
+        async with semaphore:
+            return await safe_api_call(client, url, {'ids': '-'.join(map(str, chunk))},
+                                       ttl=CACHE_TTL['match_stats'], project=project_fixture_stats)
 
-def get_team_form(team_id, league_id, season):
+    results = await asyncio.gather(*(fetch_chunk(chunk) for chunk in chunks))
+    stats = {}
+    for chunk_stats in results:
+        if chunk_stats:
+            stats.update(chunk_stats)
+    return stats
+
+async def get_team_form(client, team_id, league_id, season):
     url = f'{BASE_URL}/teams/statistics'
     params = {
         'team': team_id,
         'league': league_id,
         'season': season
     }
-    data = safe_api_call(url, headers, params)
-    if data:
-        return data.get('response', {})
-    return {}
+    data = await safe_api_call(client, url, params, ttl=CACHE_TTL['team_stats'])
+    # None means the request failed, as opposed to the team having no stats yet
+    if data is None or data.get('errors'):
+        return None
+    return data.get('response') or {}
 
 def predict_winner(home_team_stats, away_team_stats):
     # Simple scoring based on key statistics
-    scoring_factors = {
-        'wins': 3,
-        'draws': 1,
-        'loses': -1,
-        'goals_for': 0.5,
-        'goals_against': -0.5
-    }
-    
     def calculate_score(team_stats):
-        score = 0
         form = team_stats.get('form', '')
         fixtures = team_stats.get('fixtures', {})
         goals = team_stats.get('goals', {})
-        lineups = team_stats.get('lineups', [])
-        
-        # Recent form: W/D/L
-        recent_form = form.replace('W', '3 ').replace('D', '1 ').replace('L', '-1 ').split()
-        recent_score = sum([int(x) for x in recent_form]) if recent_form else 0
-        score += recent_score
         
         # Total wins, draws, loses
         wins = fixtures.get('wins', {}).get('total', 0)
         draws = fixtures.get('draws', {}).get('total', 0)
         loses = fixtures.get('loses', {}).get('total', 0)
-        score += (wins * scoring_factors['wins'] + draws * scoring_factors['draws'] + loses * scoring_factors['loses'])
         
         # Goals for and against
         goals_for = goals.get('for', {}).get('total', {}).get('total', 0)
         goals_against = goals.get('against', {}).get('total', {}).get('total', 0)
-        score += (goals_for * scoring_factors['goals_for'] + goals_against * scoring_factors['goals_against'])
         
-        return score
+        # Recent form (W/D/L) plus season record and goals
+        return (3 * form.count('W') + form.count('D') - form.count('L')
+                + wins * WIN_POINTS + draws * DRAW_POINTS + loses * LOSS_POINTS
+                + goals_for * GOAL_FOR_POINTS + goals_against * GOAL_AGAINST_POINTS)
     
     home_score = calculate_score(home_team_stats)
     away_score = calculate_score(away_team_stats)
@@ -151,7 +238,54 @@ def predict_winner(home_team_stats, away_team_stats):
     
     return prediction
 
-def main():
+async def task_result(task, default, description):
+    """Await a prefetch task, reporting the error and falling back to default if it failed"""
+    try:
+        return await task
+    except Exception as e:
+        print(f"   ❌ Failed to fetch {description}: {e!r}")
+        return default
+
+def format_match(index, match, stats, home_team_stats, away_team_stats):
+    """Render a single fixture's report as one string"""
+    out = []
+    teams = match['teams']
+    home_team = teams['home']
+    away_team = teams['away']
+    
+    out.append(f'\n🏆 Match {index}: {home_team["name"]} vs {away_team["name"]}')
+
+    if not stats:
+        out.append("   📊 No statistics available for this match yet.")
+    else:
+        for team_stats in stats:
+            team_name = team_stats['team']['name']
+            out.append(f'\n   📊 Statistics for {team_name}:')
+            out.extend([f'     • {s["type"]}: {"N/A" if s["value"] is None else s["value"]}'
+                        for s in team_stats['statistics']])
+
+    # Team forms
+    out.append("   🔍 Analyzing team forms...")
+    if home_team_stats and away_team_stats:
+        prediction = predict_winner(home_team_stats, away_team_stats)
+        out.append(f'   🎯 Prediction: {prediction}')
+    else:
+        out.append("   ❌ Team statistics not available for prediction.")
+
+    return '\n'.join(out) + '\n'
+
+def parse_args():
+    """Parse command-line options"""
+    parser = argparse.ArgumentParser(description="Football match stats and predictions")
+    parser.add_argument('--no-cache', action='store_true',
+                        help="ignore cached API responses and fetch fresh data")
+    return parser.parse_args()
+
+async def main():
+    global response_cache, use_cached_responses
+    args = parse_args()
+    use_cached_responses = not args.no_cache
+
     print("⚽ Football Stats Project")
     print("=" * 40)
     
@@ -163,14 +297,26 @@ def main():
         
         is_valid, result = validate_date(date_str)
         if is_valid:
+            season = result.year
             break
         else:
             print(f"❌ {result}")
             continue
 
+    # One HTTP/2 client for the whole run: every request is multiplexed over a
+    # single pooled TCP/TLS connection instead of opening one per call
+    limits = httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS,
+                          keepalive_expiry=30)
+    with shelve.open(CACHE_FILE) as response_cache:
+        prune_cache(response_cache)
+        async with httpx.AsyncClient(http2=True, headers=headers, timeout=10.0, limits=limits) as client:
+            await run(client, date_str, season)
+    response_cache = None
+
+async def run(client, date_str, season):
     # Get leagues
     print("📡 Fetching available leagues...")
-    leagues = get_leagues()
+    leagues = await get_leagues(client)
     
     if not leagues:
         print("❌ Failed to fetch leagues. Please check your API key and internet connection.")
@@ -178,16 +324,10 @@ def main():
 
     # Prompt user for league selection
     print("\n📋 Available Leagues:")
-    league_options = []
-    for league_info in leagues:
-        league = league_info['league']
-        country = league_info['country']
-        league_options.append({
-            'id': league['id'],
-            'name': league['name'],
-            'country': country['name']
-        })
-        print(f"{league['id']}: {league['name']} ({country['name']})")
+    league_options = {league['id']: league for league in leagues}
+    out = [f"{league_id}: {league['name']} ({league['country']})"
+           for league_id, league in league_options.items()]
+    sys.stdout.write('\n'.join(out) + '\n')
 
     # Ask for league ID with validation
     while True:
@@ -201,14 +341,12 @@ def main():
             continue
 
     # Check if the league ID exists
-    league_exists = any(league['id'] == league_id for league in league_options)
-    if not league_exists:
+    if league_id not in league_options:
         print("❌ League ID not found in the available leagues.")
         return
 
     print(f"📊 Fetching matches for {date_str}...")
-    season = datetime.strptime(date_str, '%Y-%m-%d').year
-    matches = get_matches(league_id, date_str)
+    matches = await get_matches(client, league_id, date_str, season)
     
     if not matches:
         print(f"❌ No matches found for {date_str} in the selected league.")
@@ -216,38 +354,65 @@ def main():
 
     print(f"✅ Found {len(matches)} match(es)")
     
-    for i, match in enumerate(matches, 1):
-        fixture = match['fixture']
-        teams = match['teams']
-        fixture_id = fixture['id']
-        home_team = teams['home']
-        away_team = teams['away']
-        
-        print(f'\n🏆 Match {i}: {home_team["name"]} vs {away_team["name"]}')
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
 
-        # Get statistics for the match
-        stats = get_match_stats(fixture_id)
-        if not stats:
-            print("   📊 No statistics available for this match yet.")
-        else:
-            for team_stats in stats:
-                team_name = team_stats['team']['name']
-                print(f'\n   📊 Statistics for {team_name}:')
-                for stat in team_stats['statistics']:
-                    stat_type = stat['type']
-                    stat_value = stat['value'] if stat['value'] is not None else 'N/A'
-                    print(f'     • {stat_type}: {stat_value}')
-
-        # Get team forms
-        print("   🔍 Analyzing team forms...")
-        home_team_stats = get_team_form(home_team['id'], league_id, season)
-        away_team_stats = get_team_form(away_team['id'], league_id, season)
-
-        if home_team_stats and away_team_stats:
-            prediction = predict_winner(home_team_stats, away_team_stats)
-            print(f'   🎯 Prediction: {prediction}')
-        else:
-            print("   ❌ Team statistics not available for prediction.")
+    async def limited(coro):
+        async with semaphore:
+            return await coro
+
+    # Start every request up front and await them in fixture order, so printing
+    # earlier matches overlaps with requests still in flight for later ones.
+    # Teams can appear in several fixtures, so each team's form is fetched only once.
+    stats_task = asyncio.create_task(
+        get_fixtures_bulk(client, [m['fixture']['id'] for m in matches], semaphore)
+    )
+    form_tasks = {}
+
+    def team_form_task(team_id):
+        if team_id not in form_tasks:
+            form_tasks[team_id] = asyncio.create_task(
+                limited(get_team_form(client, team_id, league_id, season))
+            )
+        return form_tasks[team_id]
+
+    async def fixture_forms(home_team, away_team):
+        """Await a fixture's team forms, fetching the away form only if the home side has data"""
+        home_team_stats = await task_result(team_form_task(home_team['id']), {},
+                                            f"team statistics for {home_team['name']}")
+        away_team_stats = {}
+        if home_team_stats:
+            away_team_stats = await task_result(team_form_task(away_team['id']), {},
+                                                f"team statistics for {away_team['name']}")
+        return home_team_stats, away_team_stats
+
+    # Probe one team first. Early in a season most teams have no stats yet, so
+    # when the API answers with an empty response only home forms are prefetched
+    # and each away form starts as soon as its home side turns out to have data.
+    # A failed probe says nothing about the season, so everything is prefetched.
+    home_ids = [m['teams']['home']['id'] for m in matches]
+    away_ids = [m['teams']['away']['id'] for m in matches]
+    probe = await task_result(team_form_task(home_ids[0]), None, 'team statistics')
+    no_data_yet = probe is not None and not probe
+    for team_id in (home_ids if no_data_yet else home_ids + away_ids):
+        team_form_task(team_id)
+    forms_tasks = [
+        asyncio.create_task(fixture_forms(m['teams']['home'], m['teams']['away']))
+        for m in matches
+    ]
+
+    try:
+        stats_by_fixture = await task_result(stats_task, {}, 'match statistics')
+        for i, (match, forms_task) in enumerate(zip(matches, forms_tasks), 1):
+            stats = stats_by_fixture.get(match['fixture']['id'], [])
+            home_team_stats, away_team_stats = await forms_task
+            sys.stdout.write(format_match(i, match, stats, home_team_stats, away_team_stats))
+    finally:
+        # Away forms are never awaited when the home side has no data; cancel any
+        # still in flight so nothing outlives the client and the cache
+        tasks = [stats_task, *form_tasks.values(), *forms_tasks]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
 
 if __name__ == '__main__':
-    main()
+    asyncio.run(main())